@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Batch job runner for the Persona-Driven Document Intelligence System.
+Runs a directory of independent JSON job specs concurrently in one process,
+sharing a single loaded model and cached document/embedding results.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from document_processor import DocumentProcessor
+from fast_scorer import DEFAULT_STATIC_MODEL_PATH
+
+SUMMARY_FILENAME = "batch_summary.json"
+
+
+def load_job_specs(jobs_dir: str) -> List[Dict[str, Any]]:
+    """Load every *.json job spec in a directory, sorted by filename.
+
+    Each spec needs `documents`, `persona` and `job`; `id`, `document_names`,
+    `deadline` (seconds) and `output` are optional. Relative document paths
+    are resolved against the spec's own directory. Specs that fail to load,
+    and every spec after the first that reuses an id, are returned with an
+    `error` entry so they show up in the summary instead of aborting the batch.
+    """
+    specs = []
+    seen_ids = {}
+    for spec_path in sorted(Path(jobs_dir).glob("*.json")):
+        spec = {"id": spec_path.stem, "spec_file": str(spec_path)}
+        try:
+            with open(spec_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            validate_job_spec(data)
+
+            spec.update(data)
+            spec["id"] = str(spec["id"])
+            spec["documents"] = [
+                str(spec_path.parent / doc) if not os.path.isabs(doc) else doc
+                for doc in data["documents"]
+            ]
+        except Exception as e:
+            spec["error"] = f"Invalid job spec: {str(e)}"
+
+        # Jobs with the same id would write the same output file
+        if spec["id"] in seen_ids:
+            spec["error"] = f"Duplicate job id {spec['id']!r}, already used by {seen_ids[spec['id']]}"
+        else:
+            seen_ids[spec["id"]] = spec["spec_file"]
+        specs.append(spec)
+
+    return specs
+
+
+def _is_string_list(value: Any) -> bool:
+    return isinstance(value, list) and all(isinstance(item, str) for item in value)
+
+
+def validate_job_spec(data: Any):
+    """Raise ValueError if a loaded job spec has missing or mistyped fields."""
+    if not isinstance(data, dict):
+        raise ValueError("Job spec must be a JSON object")
+    for field in ("documents", "persona", "job"):
+        if not data.get(field):
+            raise ValueError(f"Missing required field: {field}")
+
+    if not _is_string_list(data["documents"]):
+        raise ValueError("documents must be a list of paths")
+    for field in ("persona", "job"):
+        if not isinstance(data[field], str):
+            raise ValueError(f"{field} must be a string")
+    if "document_names" in data:
+        if not _is_string_list(data["document_names"]):
+            raise ValueError("document_names must be a list of strings")
+        if len(data["document_names"]) != len(data["documents"]):
+            raise ValueError("document_names must give one name per document")
+    if "deadline" in data:
+        deadline = data["deadline"]
+        # bool is an int subclass, but `"deadline": true` is a mistake
+        if isinstance(deadline, bool) or not isinstance(deadline, (int, float)) or deadline <= 0:
+            raise ValueError("deadline must be a positive number of seconds")
+    for field in ("id", "output"):
+        if field in data and not isinstance(data[field], str):
+            raise ValueError(f"{field} must be a string")
+    # The id names the default output file inside --output-dir
+    if "id" in data and ("/" in data["id"] or "\\" in data["id"]):
+        raise ValueError("id must not contain path separators")
+
+
+class BatchRunner:
+    def __init__(self, processor: Optional[DocumentProcessor] = None, concurrency: int = 4):
+        """Initialize the runner with one shared, caching document processor."""
+        if concurrency < 1:
+            raise ValueError("Concurrency must be at least 1")
+        self.processor = processor or DocumentProcessor()
+        self.processor.enable_caching()
+        self.concurrency = concurrency
+
+    def run_job(self, spec: Dict[str, Any], output_dir: str) -> Dict[str, Any]:
+        """Run a single job and return its summary entry. Never raises."""
+        report = {
+            "id": spec["id"],
+            "spec_file": spec.get("spec_file"),
+            "status": "failed",
+            "latency_seconds": 0.0,
+        }
+        start_time = time.perf_counter()
+
+        try:
+            if "error" in spec:
+                raise ValueError(spec["error"])
+
+            # Check documents up front, as main.validate_inputs does
+            for doc_path in spec["documents"]:
+                if not os.path.exists(doc_path):
+                    raise FileNotFoundError(f"Document not found: {doc_path}")
+                if not doc_path.lower().endswith('.pdf'):
+                    raise ValueError(f"Only PDF files are supported: {doc_path}")
+
+            result = self.processor.process_documents(
+                spec["documents"],
+                spec["persona"],
+                spec["job"],
+                document_names=spec.get("document_names"),
+                deadline_seconds=spec.get("deadline")
+            )
+
+            output_path = spec.get("output") or os.path.join(output_dir, f"{spec['id']}_output.json")
+            with open(output_path, 'w', encoding='utf-8') as f:
+                json.dump(result, f, indent=2, ensure_ascii=False)
+
+            report["output"] = output_path
+            report["sections"] = len(result["extracted_sections"])
+            if "resource_usage" in result["metadata"]:
+                report["peak_rss_mb"] = result["metadata"]["resource_usage"]["peak_rss_mb"]
+
+            # Extraction errors are printed, not raised, so check the result
+            document_errors = result["metadata"].get("document_errors")
+            if document_errors:
+                raise ValueError("; ".join(f"{e['document']}: {e['error']}" for e in document_errors))
+            if not result["extracted_sections"]:
+                raise ValueError("No sections could be extracted from the documents")
+            report["status"] = "succeeded"
+        except Exception as e:
+            report["error"] = str(e)
+
+        report["latency_seconds"] = round(time.perf_counter() - start_time, 3)
+        return report
+
+    def run(self, specs: List[Dict[str, Any]], output_dir: str) -> Dict[str, Any]:
+        """Run all jobs with bounded concurrency and build the summary report."""
+        os.makedirs(output_dir, exist_ok=True)
+        started_at = datetime.now()
+        start_time = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            job_reports = list(executor.map(lambda spec: self.run_job(spec, output_dir), specs))
+
+        latencies = [r["latency_seconds"] for r in job_reports]
+        succeeded = sum(1 for r in job_reports if r["status"] == "succeeded")
+
+        return {
+            "started_at": started_at.isoformat(),
+            "concurrency": self.concurrency,
+            "total_jobs": len(job_reports),
+            "succeeded": succeeded,
+            "failed": len(job_reports) - succeeded,
+            "wall_time_seconds": round(time.perf_counter() - start_time, 3),
+            "max_job_latency_seconds": max(latencies, default=0.0),
+            "mean_job_latency_seconds": round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+            "jobs": job_reports,
+        }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run a directory of job specs and write a summary report."""
+    parser = argparse.ArgumentParser(
+        prog="main.py run-batch",
+        description="Run a directory of JSON job specs concurrently with a shared model"
+    )
+    parser.add_argument(
+        "jobs_dir",
+        help="Directory containing *.json job specs"
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        help="Number of jobs to run at once (default: 4)"
+    )
+    parser.add_argument(
+        "--output-dir",
+        default="batch_output",
+        help="Directory for per-job outputs and the summary (default: batch_output)"
+    )
+    parser.add_argument(
+        "--memory-limit",
+        type=float,
+        metavar="MB",
+        help="Adapt each job to stay under this resident memory limit in MB"
+    )
+    parser.add_argument(
+        "--scorer",
+        choices=["full", "fast"],
+        default="full",
+        help="Embed with the full transformer or the distilled static table (default: full)"
+    )
+    parser.add_argument(
+        "--static-model",
+        default=DEFAULT_STATIC_MODEL_PATH,
+        help="Static table for --scorer fast (default: models/minilm_static.npz)"
+    )
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="Enable verbose output"
+    )
+
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.jobs_dir):
+        print(f"Error: Jobs directory not found: {args.jobs_dir}")
+        return 1
+    if args.concurrency < 1:
+        print("Error: --concurrency must be at least 1")
+        return 1
+    if args.memory_limit is not None and args.memory_limit <= 0:
+        print("Error: --memory-limit must be positive")
+        return 1
+
+    specs = load_job_specs(args.jobs_dir)
+    if not specs:
+        print(f"Error: No job specs found in {args.jobs_dir}")
+        return 1
+
+    if args.verbose:
+        print(f"Running {len(specs)} jobs with concurrency {args.concurrency}...")
+
+    runner = BatchRunner(
+        processor=DocumentProcessor(
+            memory_limit_mb=args.memory_limit,
+            scorer=args.scorer,
+            static_model_path=args.static_model
+        ),
+        concurrency=args.concurrency
+    )
+    summary = runner.run(specs, args.output_dir)
+
+    summary_path = os.path.join(args.output_dir, SUMMARY_FILENAME)
+    with open(summary_path, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2, ensure_ascii=False)
+
+    if args.verbose:
+        for report in summary["jobs"]:
+            detail = report.get("error", report.get("output", ""))
+            print(f"  {report['id']}: {report['status']} in {report['latency_seconds']:.2f}s {detail}")
+
+    print(f"{summary['succeeded']}/{summary['total_jobs']} jobs succeeded "
+          f"in {summary['wall_time_seconds']:.2f}s. Summary saved to {summary_path}")
+
+    return 0 if summary["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""
+Time budget tracking for deadline-aware (anytime) document processing.
+Records how far each stage and document got so that a ranking returned
+at the deadline can say what it was based on.
+"""
+
+import time
+from typing import Any, Dict, List, Optional
+
+# Share of the budget extraction may use before ranking must start
+EXTRACTION_SHARE = 0.5
+
+# Scoring stages in the order they run; cheaper signals first
+STAGES = ("extraction", "titles", "contents", "subsections")
+
+
+class Deadline:
+    """A time budget for one process_documents call.
+
+    The processor checks expired() between units of work (pages, encoding
+    batches) and reports its progress through record_document() and
+    record_stage(). report() summarises the progress for the output metadata.
+    """
+
+    def __init__(self, budget_seconds: float, extraction_share: float = EXTRACTION_SHARE):
+        if budget_seconds < 0:
+            raise ValueError("Deadline must not be negative")
+        self.budget_seconds = budget_seconds
+        self.extraction_share = extraction_share
+        self._start = time.monotonic()
+        self._expired_during: Optional[str] = None
+        self._stages: Dict[str, Dict[str, Any]] = {}
+        self._documents: List[Dict[str, Any]] = []
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self._start
+
+    def remaining(self) -> float:
+        return max(0.0, self.budget_seconds - self.elapsed())
+
+    def expired(self, stage: Optional[str] = None) -> bool:
+        """Check if the budget is used up, remembering the stage it ran out in."""
+        if self.remaining() > 0:
+            return False
+        if self._expired_during is None and stage is not None:
+            self._expired_during = stage
+        return True
+
+    def extraction_expired(self) -> bool:
+        """Check if extraction has used its share of the budget."""
+        if self.elapsed() < self.budget_seconds * self.extraction_share:
+            return False
+        if self._expired_during is None:
+            self._expired_during = "extraction"
+        return True
+
+    def record_document(self, document: str, pages_processed: int, total_pages: int,
+                        error: Optional[str] = None):
+        entry = {
+            "document": document,
+            "pages_processed": pages_processed,
+            "total_pages": total_pages,
+            "complete": error is None and pages_processed >= total_pages
+        }
+        if error is not None:
+            entry["error"] = error
+        self._documents.append(entry)
+
+    def record_stage(self, stage: str, processed: int, total: int):
+        """Record a stage's progress. Stages must be recorded in STAGES order.
+
+        A stage with no work is only complete if every earlier stage was;
+        otherwise its work was never generated, so it counts as skipped.
+        """
+        earlier_complete = all(s["status"] == "complete" for s in self._stages.values())
+        if processed >= total and (processed or earlier_complete):
+            status = "complete"
+        else:
+            status = "partial" if processed else "skipped"
+        self._stages[stage] = {
+            "status": status,
+            "processed": processed,
+            "total": total
+        }
+
+    @property
+    def completed(self) -> bool:
+        """True if the deadline did not cut any stage or document short.
+
+        Documents that failed to parse are reported but don't count as cut short.
+        """
+        return (all(stage["status"] == "complete" for stage in self._stages.values())
+                and all(doc["complete"] or "error" in doc for doc in self._documents))
+
+    def report(self) -> Dict[str, Any]:
+        """Summary for the output metadata."""
+        return {
+            "budget_seconds": self.budget_seconds,
+            "elapsed_seconds": round(self.elapsed(), 3),
+            "completed": self.completed,
+            "expired_during": self._expired_during,
+            "stages": {stage: self._stages[stage] for stage in STAGES if stage in self._stages},
+            "documents": list(self._documents)
+        }
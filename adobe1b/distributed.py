@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+"""
+Coordinator/worker mode for the Persona-Driven Document Intelligence System.
+Workers each hold one loaded DocumentProcessor and serve requests over TCP;
+the coordinator shards PDFs across workers, retries failed documents on
+other workers and merges each worker's local top-K into the standard output.
+
+Wire format: every message is a 12-byte header (header length as uint32,
+payload length as uint64, network byte order), a UTF-8 JSON header, and an
+optional binary payload carrying the concatenated PDF bytes.
+"""
+
+import argparse
+import heapq
+import json
+import os
+import socket
+import socketserver
+import struct
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from document_processor import DocumentProcessor
+from fast_scorer import DEFAULT_STATIC_MODEL_PATH
+
+FRAME = struct.Struct('!IQ')
+DEFAULT_TOP_K = 10
+DEFAULT_TIMEOUT = 120.0
+# Connecting takes one round trip, so a worker that doesn't answer this fast is down
+DEFAULT_CONNECT_TIMEOUT = 5.0
+
+# (host, port) of a worker
+Address = Tuple[str, int]
+
+
+class WorkerError(Exception):
+    """A worker could not complete a request."""
+
+    def __init__(self, message: str, worker_down: bool = False):
+        super().__init__(message)
+        # True when the worker itself is unreachable, not just this request
+        self.worker_down = worker_down
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytearray:
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        n = sock.recv_into(view[received:], size - received)
+        if n == 0:
+            raise ConnectionError("Connection closed mid-message")
+        received += n
+    return buffer
+
+
+def send_message(sock: socket.socket, header: Dict[str, Any], payload: bytes = b""):
+    """Send a JSON header and optional binary payload as one framed message."""
+    header_bytes = json.dumps(header, ensure_ascii=False).encode('utf-8')
+    sock.sendall(FRAME.pack(len(header_bytes), len(payload)) + header_bytes)
+    if payload:
+        sock.sendall(payload)
+
+
+def recv_message(sock: socket.socket) -> Tuple[Dict[str, Any], memoryview]:
+    """Receive one framed message. Returns (header, payload)."""
+    header_len, payload_len = FRAME.unpack(_recv_exact(sock, FRAME.size))
+    header = json.loads(_recv_exact(sock, header_len).decode('utf-8'))
+    payload = memoryview(_recv_exact(sock, payload_len)) if payload_len else memoryview(b"")
+    return header, payload
+
+
+def parse_address(address: str) -> Address:
+    """Parse 'host:port' into an address tuple."""
+    host, sep, port = address.rpartition(':')
+    if not sep or not host:
+        raise ValueError(f"Worker address must be host:port, got {address!r}")
+    return host, int(port)
+
+
+def top_k_results(result: Dict[str, Any], top_k: int) -> Dict[str, Any]:
+    """Trim a process_documents result to its top-K sections and subsections.
+
+    Documents that failed to parse are passed on so the coordinator can
+    report them.
+    """
+    return {
+        "extracted_sections": result["extracted_sections"][:top_k],
+        "sub_section_analyses": result["sub_section_analyses"][:top_k],
+        "document_errors": result["metadata"].get("document_errors", [])
+    }
+
+
+class _WorkerHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        """Serve requests on one connection until the client disconnects."""
+        while True:
+            try:
+                header, payload = recv_message(self.request)
+            except (OSError, struct.error):
+                return
+            except ValueError as e:
+                # Malformed JSON or UTF-8 in the header; the stream can't be trusted
+                send_message(self.request, {"status": "error", "error": f"Malformed request: {str(e)}"})
+                return
+            try:
+                response = self.server.handle_request_message(header, payload)
+            except Exception as e:
+                response = {"status": "error", "error": str(e)}
+            send_message(self.request, response)
+
+
+class WorkerServer(socketserver.ThreadingTCPServer):
+    """TCP server answering process requests with a shared DocumentProcessor."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address: Address, processor: Optional[DocumentProcessor] = None):
+        super().__init__(address, _WorkerHandler)
+        self.processor = processor or DocumentProcessor()
+        self.processor.enable_caching()
+
+    def handle_request_message(self, header: Dict[str, Any], payload: memoryview) -> Dict[str, Any]:
+        """Run one request. Documents arrive as consecutive slices of the payload."""
+        if header.get("type") == "ping":
+            return {"status": "ok"}
+        if header.get("type") != "process":
+            raise ValueError(f"Unknown request type: {header.get('type')!r}")
+
+        documents = []
+        offset = 0
+        for size in header["document_sizes"]:
+            documents.append(payload[offset:offset + size])
+            offset += size
+
+        result = self.processor.process_documents(
+            documents,
+            header["persona"],
+            header["job"],
+            document_names=header["document_names"]
+        )
+        return {"status": "ok", **top_k_results(result, header.get("top_k", DEFAULT_TOP_K))}
+
+
+class Coordinator:
+    def __init__(self, workers: List[Address], top_k: int = DEFAULT_TOP_K,
+                 timeout: float = DEFAULT_TIMEOUT,
+                 connect_timeout: float = DEFAULT_CONNECT_TIMEOUT):
+        """Initialize the coordinator with the worker addresses to shard across."""
+        if not workers:
+            raise ValueError("At least one worker is required")
+        if top_k < 1:
+            raise ValueError("top_k must be at least 1")
+        self.workers = list(dict.fromkeys(workers))
+        self.top_k = top_k
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+
+    def _request(self, worker: Address, header: Dict[str, Any], payload: bytes = b"") -> Dict[str, Any]:
+        """Send one request to a worker and return its response header."""
+        try:
+            # Tasks are whole documents, so a connection per request is cheap
+            sock = socket.create_connection(worker, timeout=self.connect_timeout)
+        except OSError as e:
+            # Refused, or dropped by a host that is off or firewalled
+            raise WorkerError(f"{worker[0]}:{worker[1]} unreachable: {str(e)}", worker_down=True)
+        try:
+            with sock:
+                sock.settimeout(self.timeout)
+                send_message(sock, header, payload)
+                response, _ = recv_message(sock)
+        except socket.timeout:
+            # A slow request, not a dead worker; TimeoutError is also an OSError
+            raise WorkerError(f"{worker[0]}:{worker[1]} timed out after {self.timeout}s")
+        except ConnectionError as e:
+            # Reset or closed mid-message
+            raise WorkerError(f"{worker[0]}:{worker[1]} unreachable: {str(e)}", worker_down=True)
+        except (OSError, ValueError, struct.error) as e:
+            raise WorkerError(f"{worker[0]}:{worker[1]} failed: {str(e)}")
+        if response.get("status") != "ok":
+            raise WorkerError(f"{worker[0]}:{worker[1]} failed: {response.get('error')}")
+        return response
+
+    def _run_task(self, worker: Address, name: str, data: bytes,
+                  persona: str, job: str) -> Dict[str, Any]:
+        header = {
+            "type": "process",
+            "persona": persona,
+            "job": job,
+            "top_k": self.top_k,
+            "document_names": [name],
+            "document_sizes": [len(data)]
+        }
+        return self._request(worker, header, data)
+
+    def process_documents(self, document_paths: List[str], persona: str, job: str,
+                          document_names: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Shard documents across workers and merge their top-K into the standard output."""
+        start_time = datetime.now()
+        names = list(document_names) if document_names else \
+            [os.path.basename(path) for path in document_paths]
+        if len(names) != len(document_paths):
+            raise ValueError(f"Got {len(names)} document names for {len(document_paths)} documents")
+        # Results, assignments and failures are all reported by name
+        duplicates = sorted({name for name in names if names.count(name) > 1})
+        if duplicates:
+            raise ValueError(
+                f"Duplicate document names {duplicates}; use --document-names to tell them apart"
+            )
+
+        # One task per document, so a failure only needs that document retried
+        pending = deque(range(len(document_paths)))
+        tried = {task: set() for task in pending}
+        live = set(self.workers)
+        idle = list(self.workers)
+        partial_results = []
+        assignments = {}
+        failures = []
+        retries = 0
+
+        with ThreadPoolExecutor(max_workers=len(self.workers)) as executor:
+            in_flight = {}
+            while pending or in_flight:
+                for task in list(pending):
+                    if not live - tried[task]:
+                        pending.remove(task)
+                        failures.append({"document": names[task], "error": "No worker could process it"})
+                        continue
+                    candidates = [w for w in idle if w not in tried[task]]
+                    if not candidates:
+                        continue
+                    pending.remove(task)
+                    try:
+                        with open(document_paths[task], 'rb') as f:
+                            data = f.read()
+                    except OSError as e:
+                        failures.append({"document": names[task], "error": str(e)})
+                        continue
+                    worker = candidates[0]
+                    idle.remove(worker)
+                    future = executor.submit(self._run_task, worker, names[task], data, persona, job)
+                    in_flight[future] = (worker, task)
+
+                if not in_flight:
+                    break
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    worker, task = in_flight.pop(future)
+                    try:
+                        response = future.result()
+                        if response.get("document_errors"):
+                            # A parse failure would fail on every worker, so don't retry
+                            failures.extend(response["document_errors"])
+                        else:
+                            partial_results.append(response)
+                            assignments[names[task]] = f"{worker[0]}:{worker[1]}"
+                    except WorkerError as e:
+                        print(f"Retrying {names[task]} elsewhere: {str(e)}")
+                        tried[task].add(worker)
+                        pending.append(task)
+                        retries += 1
+                        if e.worker_down:
+                            live.discard(worker)
+                            continue
+                    idle.append(worker)
+
+        # The global top-K is always contained in the union of local top-Ks
+        extracted_sections = heapq.nlargest(
+            self.top_k,
+            (s for r in partial_results for s in r["extracted_sections"]),
+            key=lambda s: s["importance_rank"]
+        )
+        sub_section_analyses = heapq.nlargest(
+            self.top_k,
+            (s for r in partial_results for s in r["sub_section_analyses"]),
+            key=lambda s: s["importance_rank"]
+        )
+
+        return {
+            "metadata": {
+                "input_documents": names,
+                "persona": persona,
+                "job_to_be_done": job,
+                "processing_timestamp": start_time.isoformat(),
+                "distributed": {
+                    "workers": [f"{host}:{port}" for host, port in self.workers],
+                    "top_k": self.top_k,
+                    "assignments": assignments,
+                    "retries": retries,
+                    "failed_documents": failures
+                }
+            },
+            "extracted_sections": extracted_sections,
+            "sub_section_analyses": sub_section_analyses
+        }
+
+
+def worker_main(argv: Optional[List[str]] = None) -> int:
+    """Serve process requests from a coordinator."""
+    parser = argparse.ArgumentParser(
+        prog="main.py worker",
+        description="Run a document processing worker for a coordinator"
+    )
+    parser.add_argument(
+        "--host",
+        default="127.0.0.1",
+        help="Interface to listen on (default: 127.0.0.1)"
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=0,
+        help="Port to listen on; 0 picks a free port (default: 0)"
+    )
+    parser.add_argument(
+        "--memory-limit",
+        type=float,
+        metavar="MB",
+        help="Adapt processing to stay under this resident memory limit in MB"
+    )
+    parser.add_argument(
+        "--scorer",
+        choices=["full", "fast"],
+        default="full",
+        help="Embed with the full transformer or the distilled static table (default: full)"
+    )
+    parser.add_argument(
+        "--static-model",
+        default=DEFAULT_STATIC_MODEL_PATH,
+        help="Static table for --scorer fast (default: models/minilm_static.npz)"
+    )
+
+    args = parser.parse_args(argv)
+
+    processor = DocumentProcessor(
+        memory_limit_mb=args.memory_limit,
+        scorer=args.scorer,
+        static_model_path=args.static_model
+    )
+    server = WorkerServer((args.host, args.port), processor)
+    host, port = server.server_address[:2]
+    # Parsed by launchers that start workers on port 0
+    print(f"Worker listening on {host}:{port}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+def coordinator_main(argv: Optional[List[str]] = None) -> int:
+    """Shard documents across workers and write the merged output."""
+    parser = argparse.ArgumentParser(
+        prog="main.py coordinate",
+        description="Process documents on a set of workers and merge their top-K results"
+    )
+    parser.add_argument(
+        "--workers",
+        nargs="+",
+        required=True,
+        help="Worker addresses as host:port"
+    )
+    parser.add_argument(
+        "--documents",
+        nargs="+",
+        required=True,
+        help="Paths to PDF documents to process"
+    )
+    parser.add_argument(
+        "--document-names",
+        nargs="+",
+        help="Names reported in the output for each document (default: file basenames)"
+    )
+    parser.add_argument(
+        "--persona",
+        required=True,
+        help="Persona/role description (e.g., 'Investment Analyst')"
+    )
+    parser.add_argument(
+        "--job",
+        required=True,
+        help="Job to be done (e.g., 'Analyze revenue trends')"
+    )
+    parser.add_argument(
+        "--top-k",
+        type=int,
+        default=DEFAULT_TOP_K,
+        help=f"Number of sections and subsections to keep (default: {DEFAULT_TOP_K})"
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=DEFAULT_TIMEOUT,
+        help=f"Seconds to wait for a worker before retrying elsewhere (default: {DEFAULT_TIMEOUT:g})"
+    )
+    parser.add_argument(
+        "--connect-timeout",
+        type=float,
+        default=DEFAULT_CONNECT_TIMEOUT,
+        help=f"Seconds to wait for a connection before treating a worker as down "
+             f"(default: {DEFAULT_CONNECT_TIMEOUT:g})"
+    )
+    parser.add_argument(
+        "--output",
+        default="challenge1b_output.json",
+        help="Output JSON file path (default: challenge1b_output.json)"
+    )
+
+    args = parser.parse_args(argv)
+
+    for doc_path in args.documents:
+        if not os.path.exists(doc_path):
+            print(f"Error: Document not found: {doc_path}")
+            return 1
+
+    try:
+        coordinator = Coordinator(
+            [parse_address(w) for w in args.workers], top_k=args.top_k,
+            timeout=args.timeout, connect_timeout=args.connect_timeout
+        )
+        result = coordinator.process_documents(
+            args.documents, args.persona, args.job, document_names=args.document_names
+        )
+    except (OSError, ValueError) as e:
+        print(f"Error: {str(e)}")
+        return 1
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(result, f, indent=2, ensure_ascii=False)
+    print(f"Results saved to {args.output}")
+
+    failed = result["metadata"]["distributed"]["failed_documents"]
+    for failure in failed:
+        print(f"Error: {failure['document']}: {failure['error']}")
+    return 0 if not failed else 1
@@ -1,18 +1,59 @@
 import PyPDF2
 import re
+import io
+import copy
 import json
-from typing import List, Dict, Tuple, Any
-from sentence_transformers import SentenceTransformer
+import mmap
+import threading
+from contextlib import ExitStack, contextmanager
+from typing import List, Dict, Tuple, Any, BinaryIO, Iterator, Optional, Sequence, Union
 import numpy as np
 from sklearn.metrics.pairwise import cosine_similarity
 from datetime import datetime
 import os
+from memory_governor import (
+    DEFAULT_BATCH_SIZE, ENCODING_STAGE, LRUCache, MemoryGovernor, SpillStore,
+    SpilledEmbeddingCache
+)
+from deadline import Deadline
+from fast_scorer import DEFAULT_STATIC_MODEL_PATH, StaticEmbeddingModel
+
+# A document can be a filesystem path, raw PDF bytes, a memoryview over PDF
+# bytes, or a binary file-like object. A file-like object is read from its
+# current position, so the PDF must start there; the position is not reset.
+DocumentSource = Union[str, os.PathLike, bytes, bytearray, memoryview, BinaryIO]
+
+# On-disk PDFs at least this large are mapped into memory instead of read
+# through a buffered file object.
+MMAP_THRESHOLD_BYTES = 8 * 1024 * 1024
+
+# Default bounds for the caches kept by enable_caching(): parsed documents,
+# and text embeddings (about 1.5 KB each plus the text itself)
+SECTION_CACHE_DOCUMENTS = 64
+EMBEDDING_CACHE_TEXTS = 20000
 
 class DocumentProcessor:
-    def __init__(self):
-        """Initialize the document processor with a lightweight sentence transformer model."""
-        # Using a small model to meet the 1GB constraint
-        self.model = SentenceTransformer('all-MiniLM-L6-v2')  # ~90MB model
+    def __init__(self, memory_limit_mb: Optional[float] = None,
+                 encode_batch_size: int = DEFAULT_BATCH_SIZE,
+                 scorer: str = "full",
+                 static_model_path: str = DEFAULT_STATIC_MODEL_PATH):
+        """Initialize the document processor with a lightweight sentence transformer model.
+        
+        With `memory_limit_mb` set, each process_documents call is run under a
+        MemoryGovernor that degrades the pipeline as RSS approaches the limit.
+        With `scorer="fast"`, texts are embedded with the static token table at
+        `static_model_path` instead of the transformer, which is never loaded.
+        """
+        if scorer == "fast":
+            self.model = StaticEmbeddingModel.load(static_model_path)
+        elif scorer == "full":
+            # Imported here so the fast scorer doesn't pay for loading torch
+            from sentence_transformers import SentenceTransformer
+            # Using a small model to meet the 1GB constraint
+            self.model = SentenceTransformer('all-MiniLM-L6-v2')  # ~90MB model
+        else:
+            raise ValueError(f"Unknown scorer: {scorer!r} (expected 'full' or 'fast')")
+        self.scorer = scorer
         self.section_patterns = [
             r'^[A-Z][A-Z\s]+$',  # ALL CAPS titles
             r'^\d+\.\s+[A-Z]',   # Numbered sections
@@ -20,55 +61,348 @@ class DocumentProcessor:
             r'^Chapter\s+\d+',   # Chapter headers
             r'^Section\s+\d+',   # Section headers
         ]
+        # Shared caches, only populated once enable_caching() is called
+        self._cache_lock = threading.Lock()
+        self._section_cache = None
+        self._embedding_cache = None
+        self.memory_limit_mb = memory_limit_mb
+        self.encode_batch_size = encode_batch_size
+    
+    def enable_caching(self, max_documents: int = SECTION_CACHE_DOCUMENTS,
+                       max_embeddings: int = EMBEDDING_CACHE_TEXTS):
+        """Reuse parsed documents and text embeddings across process_documents calls.
+        
+        Intended for long-lived processors that see the same documents in
+        several jobs. Both caches evict their least recently used entries
+        beyond `max_documents` documents and `max_embeddings` texts, so
+        memory stays bounded however many jobs run. Caches are guarded by a
+        lock so one processor can be shared between threads.
+        """
+        with self._cache_lock:
+            if self._section_cache is None:
+                self._section_cache = LRUCache(max_documents)
+            if self._embedding_cache is None:
+                self._embedding_cache = LRUCache(max_embeddings)
+    
+    def _section_cache_key(self, source: DocumentSource, document_name: str) -> Optional[Tuple]:
+        """Build a cache key for parsed sections, or None if the source can't be cached."""
+        if not self._is_path_source(source):
+            return None
+        try:
+            stat = os.stat(source)
+        except OSError:
+            return None
+        return (os.path.realpath(source), stat.st_mtime_ns, stat.st_size, document_name)
+    
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        """Encode texts with the sentence transformer, reusing cached embeddings."""
+        if self._embedding_cache is None:
+            return self.model.encode(texts)
+        
+        # Collect this call's embeddings locally, as the cache may evict them
+        with self._cache_lock:
+            embeddings = {t: self._embedding_cache[t] for t in dict.fromkeys(texts)
+                          if t in self._embedding_cache}
+        missing = [t for t in dict.fromkeys(texts) if t not in embeddings]
+        if missing:
+            encoded = self.model.encode(missing)
+            embeddings.update(zip(missing, encoded))
+            with self._cache_lock:
+                for text, embedding in zip(missing, encoded):
+                    self._embedding_cache.setdefault(text, embedding)
+        return np.array([embeddings[t] for t in texts])
+    
+    def _spill_embedding_cache(self):
+        """Move cached embeddings to a temporary file, keeping only keys in memory."""
+        with self._cache_lock:
+            if isinstance(self._embedding_cache, LRUCache):
+                self._embedding_cache = SpilledEmbeddingCache(
+                    dict(self._embedding_cache.items()), SpillStore(),
+                    self._embedding_cache.max_entries
+                )
+    
+    @staticmethod
+    def _spill_sections(sections: List[Dict], governor: MemoryGovernor):
+        """Move section content to the governor's spill store."""
+        for section in sections:
+            if 'content' in section:
+                section['content_ref'] = governor.spill_store.put_text(section.pop('content'))
+    
+    @staticmethod
+    def _section_content(section: Dict, governor: Optional[MemoryGovernor] = None) -> str:
+        """Return section content, reading it back from disk if it was spilled."""
+        if 'content' in section:
+            return section['content']
+        return governor.spill_store.get_text(section['content_ref'])
+    
+    @staticmethod
+    def _subsection_text(subsection: Dict, governor: Optional[MemoryGovernor] = None) -> str:
+        """Return subsection text, reading it back from disk if it was spilled."""
+        if 'refined_text' in subsection:
+            return subsection['refined_text']
+        return governor.spill_store.get_text(subsection['refined_text_ref'])
+    
+    def _subsection_items(self, sections: List[Dict], order: List[int],
+                          visited: List[int], governor: Optional[MemoryGovernor] = None
+                          ) -> Iterator[Tuple[Dict, str, str]]:
+        """Derive each section's subsections only when scoring reaches it.
+        
+        Yields (subsection, 'importance_rank', text) items for _score_texts and
+        records the index of each section it visits in `visited`. While the
+        governor is spilling, subsection text goes straight to the spill store,
+        so only the batch being encoded is held in memory.
+        """
+        for i in order:
+            section = sections[i]
+            if section['importance_rank'] is None:
+                continue
+            visited.append(i)
+            section['subsections'] = self.extract_subsections(self._section_content(section, governor))
+            for subsection in section['subsections']:
+                text = subsection['refined_text']
+                if governor is not None and governor.spilling:
+                    subsection['refined_text_ref'] = governor.spill_store.put_text(
+                        subsection.pop('refined_text')
+                    )
+                yield (subsection, 'importance_rank', text)
+    
+    @staticmethod
+    def _is_path_source(source: DocumentSource) -> bool:
+        """Check if a document source refers to a file on disk."""
+        return isinstance(source, (str, os.PathLike))
     
-    def extract_text_from_pdf(self, pdf_path: str) -> List[Dict[str, Any]]:
-        """Extract text and identify sections from a PDF document."""
+    def resolve_document_names(self, documents: Sequence[DocumentSource],
+                               document_names: Optional[Sequence[str]] = None) -> List[str]:
+        """Resolve the name reported in the `document` field for each source."""
+        if document_names is not None and len(document_names) != len(documents):
+            raise ValueError(
+                f"Got {len(document_names)} document names for {len(documents)} documents"
+            )
+        
+        names = []
+        for i, source in enumerate(documents):
+            if document_names is not None and document_names[i]:
+                names.append(document_names[i])
+            elif self._is_path_source(source):
+                names.append(os.path.basename(os.fspath(source)))
+            else:
+                raise ValueError(
+                    f"A document name is required for in-memory document #{i + 1}"
+                )
+        return names
+    
+    @contextmanager
+    def _open_pdf_source(self, source: DocumentSource, force_mmap: bool = False) -> Iterator[BinaryIO]:
+        """Yield a seekable binary stream over a document source."""
+        if self._is_path_source(source):
+            with open(source, 'rb') as file:
+                size = os.fstat(file.fileno()).st_size
+                if size == 0 or (size < MMAP_THRESHOLD_BYTES and not force_mmap):
+                    yield file
+                    return
+                # Large PDFs are paged in by the OS on demand
+                mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+                try:
+                    yield mapped
+                finally:
+                    mapped.close()
+        elif isinstance(source, (bytes, bytearray, memoryview)):
+            yield io.BytesIO(source)
+        elif hasattr(source, 'read'):
+            seekable = getattr(source, 'seekable', None)
+            if seekable is not None and seekable() and source.tell() == 0:
+                yield source
+            else:
+                # Non-seekable streams (pipes, sockets) are buffered once. So are
+                # streams part-way through, since PDF offsets count from the
+                # start of the PDF rather than the start of the stream.
+                yield io.BytesIO(source.read())
+        else:
+            raise TypeError(f"Unsupported document source type: {type(source).__name__}")
+    
+    def _cached_sections(self, source: DocumentSource, document_name: str
+                         ) -> Tuple[Optional[Tuple], Optional[List[Dict]], int]:
+        """Look up parsed sections in the cache.
+        
+        Returns (cache_key, sections or None, page count of the document).
+        """
+        if self._section_cache is None:
+            return None, None, 0
+        cache_key = self._section_cache_key(source, document_name)
+        with self._cache_lock:
+            cached = self._section_cache.get(cache_key) if cache_key else None
+        if cached is None:
+            return cache_key, None, 0
+        # Ranking annotates sections in place, so hand out copies
+        sections, page_count = cached
+        return cache_key, copy.deepcopy(sections), page_count
+    
+    def _cache_sections(self, cache_key: Optional[Tuple], sections: List[Dict], page_count: int):
+        """Store parsed sections, with the document's page count, in the cache."""
+        # Spilled content lives in a per-call file, so it can't be cached
+        if cache_key is not None and all('content' in section for section in sections):
+            with self._cache_lock:
+                self._section_cache.setdefault(cache_key, (copy.deepcopy(sections), page_count))
+    
+    def _page_sections(self, text: str, page_num: int, document_name: str) -> List[Dict[str, Any]]:
+        """Split the text of one page into sections."""
+        sections = []
+        if not text.strip():
+            return sections
+        
+        # Split text into paragraphs
+        paragraphs = [p.strip() for p in text.split('\n\n') if p.strip()]
+        
+        current_section = {
+            'document': document_name,
+            'page_number': page_num,
+            'section_title': f"Page {page_num}",
+            'content': '',
+            'subsections': []
+        }
+        
+        for para in paragraphs:
+            # Check if paragraph is a section header
+            if self._is_section_header(para):
+                if current_section['content']:
+                    sections.append(current_section)
+                
+                current_section = {
+                    'document': document_name,
+                    'page_number': page_num,
+                    'section_title': para.strip(),
+                    'content': '',
+                    'subsections': []
+                }
+            else:
+                current_section['content'] += para + '\n\n'
+        
+        if current_section['content']:
+            sections.append(current_section)
+        
+        return sections
+    
+    def extract_text_from_pdf(self, pdf_source: DocumentSource,
+                              document_name: Optional[str] = None,
+                              governor: Optional[MemoryGovernor] = None,
+                              errors: Optional[List[Dict[str, str]]] = None) -> List[Dict[str, Any]]:
+        """Extract text and identify sections from a PDF document.
+        
+        Extraction errors are printed rather than raised; pass `errors` to
+        also collect them as {"document", "error"} entries.
+        """
         sections = []
+        if document_name is None:
+            document_name = self.resolve_document_names([pdf_source])[0]
+        
+        cache_key, cached, _ = self._cached_sections(pdf_source, document_name)
+        if cached is not None:
+            return cached
         
         try:
-            with open(pdf_path, 'rb') as file:
+            # Under memory pressure, let the OS page the file in on demand
+            force_mmap = governor is not None and governor.streaming
+            with self._open_pdf_source(pdf_source, force_mmap=force_mmap) as file:
                 pdf_reader = PyPDF2.PdfReader(file)
                 
                 for page_num, page in enumerate(pdf_reader.pages, 1):
-                    text = page.extract_text()
-                    if not text.strip():
-                        continue
+                    if governor is not None:
+                        governor.check("extraction")
+                        if governor.spilling:
+                            self._spill_sections(sections, governor)
                     
-                    # Split text into paragraphs
-                    paragraphs = [p.strip() for p in text.split('\n\n') if p.strip()]
-                    
-                    current_section = {
-                        'document': os.path.basename(pdf_path),
-                        'page_number': page_num,
-                        'section_title': f"Page {page_num}",
-                        'content': '',
-                        'subsections': []
-                    }
-                    
-                    for para in paragraphs:
-                        # Check if paragraph is a section header
-                        if self._is_section_header(para):
-                            if current_section['content']:
-                                sections.append(current_section)
-                            
-                            current_section = {
-                                'document': os.path.basename(pdf_path),
-                                'page_number': page_num,
-                                'section_title': para.strip(),
-                                'content': '',
-                                'subsections': []
-                            }
-                        else:
-                            current_section['content'] += para + '\n\n'
-                    
-                    if current_section['content']:
-                        sections.append(current_section)
+                    sections.extend(self._page_sections(page.extract_text(), page_num, document_name))
                         
         except Exception as e:
-            print(f"Error processing {pdf_path}: {str(e)}")
-            
+            print(f"Error processing {document_name}: {str(e)}")
+            if errors is not None:
+                errors.append({"document": document_name, "error": str(e)})
+            return sections
+        
+        self._cache_sections(cache_key, sections, len(pdf_reader.pages))
         return sections
     
+    def _extract_by_page_order(self, documents: Sequence[DocumentSource], names: List[str],
+                               deadline: Deadline,
+                               governor: Optional[MemoryGovernor] = None,
+                               errors: Optional[List[Dict[str, str]]] = None) -> List[Dict[str, Any]]:
+        """Extract page 1 of every document, then page 2, and so on, until the
+        extraction share of the deadline is used up."""
+        all_sections = []
+        pending = []
+        
+        with ExitStack() as stack:
+            for source, name in zip(documents, names):
+                cache_key, cached, page_count = self._cached_sections(source, name)
+                if cached is not None:
+                    all_sections.extend(cached)
+                    deadline.record_document(name, page_count, page_count)
+                    continue
+                try:
+                    force_mmap = governor is not None and governor.streaming
+                    file = stack.enter_context(self._open_pdf_source(source, force_mmap=force_mmap))
+                    reader = PyPDF2.PdfReader(file)
+                    # The page tree is parsed lazily, so a broken one fails here
+                    total_pages = len(reader.pages)
+                    pending.append({
+                        'name': name,
+                        'reader': reader,
+                        'total_pages': total_pages,
+                        'pages_done': 0,
+                        'sections': [],
+                        'cache_key': cache_key,
+                        'error': None
+                    })
+                except Exception as e:
+                    print(f"Error processing {name}: {str(e)}")
+                    deadline.record_document(name, 0, 0, error=str(e))
+                    if errors is not None:
+                        errors.append({"document": name, "error": str(e)})
+            
+            page_index = 0
+            while True:
+                active = [doc for doc in pending
+                          if doc['error'] is None and page_index < doc['total_pages']]
+                if not active or deadline.extraction_expired():
+                    break
+                
+                for doc in active:
+                    if deadline.extraction_expired():
+                        break
+                    if governor is not None:
+                        governor.check("extraction")
+                        if governor.spilling:
+                            self._spill_sections(all_sections, governor)
+                    try:
+                        text = doc['reader'].pages[page_index].extract_text()
+                    except Exception as e:
+                        print(f"Error processing {doc['name']}: {str(e)}")
+                        doc['error'] = str(e)
+                        if errors is not None:
+                            errors.append({"document": doc['name'], "error": str(e)})
+                        continue
+                    page_sections = self._page_sections(text, page_index + 1, doc['name'])
+                    doc['sections'].extend(page_sections)
+                    all_sections.extend(page_sections)
+                    doc['pages_done'] = page_index + 1
+                
+                page_index += 1
+            
+            for doc in pending:
+                deadline.record_document(
+                    doc['name'], doc['pages_done'], doc['total_pages'], error=doc['error']
+                )
+                if doc['error'] is None and doc['pages_done'] == doc['total_pages']:
+                    self._cache_sections(doc['cache_key'], doc['sections'], doc['total_pages'])
+        
+        documents_report = deadline.report()["documents"]
+        deadline.record_stage(
+            "extraction",
+            sum(doc["pages_processed"] for doc in documents_report),
+            sum(doc["total_pages"] for doc in documents_report)
+        )
+        return all_sections
+    
     def _is_section_header(self, text: str) -> bool:
         """Check if text appears to be a section header."""
         text = text.strip()
@@ -117,8 +451,8 @@ class DocumentProcessor:
             context = f"{persona}: {job}"
             
             # Encode the context and text
-            context_embedding = self.model.encode([context])
-            text_embedding = self.model.encode([text])
+            context_embedding = self._encode([context])
+            text_embedding = self._encode([text])
             
             # Calculate cosine similarity
             similarity = cosine_similarity(context_embedding, text_embedding)[0][0]
@@ -128,41 +462,168 @@ class DocumentProcessor:
             print(f"Error calculating relevance: {str(e)}")
             return 0.0
     
-    def rank_sections(self, sections: List[Dict], persona: str, job: str) -> List[Dict]:
-        """Rank sections by relevance to persona and job."""
-        for section in sections:
-            # Calculate relevance for section title and content
-            title_score = self.calculate_relevance_score(section['section_title'], persona, job)
-            content_score = self.calculate_relevance_score(section['content'], persona, job)
-            
+    def _score_batch(self, batch: List[Tuple[Any, Any, str]], context_embedding: np.ndarray,
+                     governor: Optional[MemoryGovernor] = None):
+        """Encode one batch of texts and store each similarity at target[key]."""
+        if governor is not None:
+            governor.check(ENCODING_STAGE)
+            if governor.spilling:
+                self._spill_embedding_cache()
+        
+        try:
+            embeddings = self._encode([text for _, _, text in batch])
+            similarities = cosine_similarity(context_embedding, embeddings)[0]
+        except Exception as e:
+            print(f"Error calculating relevance: {str(e)}")
+            similarities = [0.0] * len(batch)
+        
+        for (target, key, _), similarity in zip(batch, similarities):
+            target[key] = float(similarity)
+    
+    def _score_texts(self, items: Iterator[Tuple[Any, Any, str]], context_embedding: np.ndarray,
+                     governor: Optional[MemoryGovernor] = None,
+                     deadline: Optional[Deadline] = None, stage: Optional[str] = None) -> int:
+        """Score (target, key, text) items in batches sized by the governor.
+        
+        Stops before the next batch once the deadline has expired. Returns
+        the number of items scored.
+        """
+        scored = 0
+        batch = []
+        for item in items:
+            batch.append(item)
+            batch_size = governor.batch_size if governor is not None else self.encode_batch_size
+            if len(batch) >= batch_size:
+                if deadline is not None and deadline.expired(stage):
+                    return scored
+                self._score_batch(batch, context_embedding, governor)
+                scored += len(batch)
+                batch = []
+        if batch and not (deadline is not None and deadline.expired(stage)):
+            self._score_batch(batch, context_embedding, governor)
+            scored += len(batch)
+        return scored
+    
+    def rank_sections(self, sections: List[Dict], persona: str, job: str,
+                      governor: Optional[MemoryGovernor] = None,
+                      deadline: Optional[Deadline] = None) -> List[Dict]:
+        """Rank sections by relevance to persona and job.
+        
+        Titles are scored first, then contents, then subsections, each in
+        page order. With a deadline, scoring stops when it expires and the
+        best ranking so far is returned: sections whose content was not
+        scored are ranked on their title alone, and sections or subsections
+        that were not scored at all are left out.
+        """
+        # Combine persona and job for context
+        context_embedding = self._encode([f"{persona}: {job}"])
+        
+        # Earlier pages first, so a cut-off run has covered the start of every document
+        order = sorted(range(len(sections)), key=lambda i: sections[i]['page_number'])
+        title_scores = [None] * len(sections)
+        content_scores = [None] * len(sections)
+        
+        # Calculate relevance for section titles and content; content is
+        # generated lazily so spilled sections are read back one batch at a time
+        scored = self._score_texts(
+            ((title_scores, i, sections[i]['section_title']) for i in order),
+            context_embedding, governor, deadline, "titles"
+        )
+        if deadline is not None:
+            deadline.record_stage("titles", scored, len(sections))
+        
+        scored = self._score_texts(
+            ((content_scores, i, self._section_content(sections[i], governor)) for i in order),
+            context_embedding, governor, deadline, "contents"
+        )
+        if deadline is not None:
+            deadline.record_stage("contents", scored, len(sections))
+        
+        for i, section in enumerate(sections):
+            section['subsections'] = []
+            if title_scores[i] is None:
+                section['importance_rank'] = None
+                continue
             # Weighted score (title more important)
-            section['importance_rank'] = (title_score * 0.7) + (content_score * 0.3)
-            
-            # Extract and rank subsections
-            section['subsections'] = self.extract_subsections(section['content'])
-            for subsection in section['subsections']:
-                subsection_score = self.calculate_relevance_score(
-                    subsection['refined_text'], persona, job
-                )
-                subsection['importance_rank'] = subsection_score
+            content_score = content_scores[i] if content_scores[i] is not None else title_scores[i]
+            section['importance_rank'] = (title_scores[i] * 0.7) + (content_score * 0.3)
+        
+        # Extract and rank subsections
+        visited = []
+        self._score_texts(
+            self._subsection_items(sections, order, visited, governor),
+            context_embedding, governor, deadline, "subsections"
+        )
+        if deadline is not None:
+            # Counted in sections, since the subsections of sections the
+            # deadline cut off are never derived
+            ranked = sum(1 for section in sections if section['importance_rank'] is not None)
+            done = sum(
+                1 for i in visited
+                if all('importance_rank' in subsection for subsection in sections[i]['subsections'])
+            )
+            deadline.record_stage("subsections", done, ranked)
+            for section in sections:
+                section['subsections'] = [
+                    subsection for subsection in section['subsections']
+                    if 'importance_rank' in subsection
+                ]
+            sections = [section for section in sections if section['importance_rank'] is not None]
         
         # Sort sections by importance rank
         sections.sort(key=lambda x: x['importance_rank'], reverse=True)
         
         return sections
     
-    def process_documents(self, document_paths: List[str], persona: str, job: str) -> Dict[str, Any]:
-        """Main processing function that handles the entire pipeline."""
+    def process_documents(self, documents: Sequence[DocumentSource], persona: str, job: str,
+                          document_names: Optional[Sequence[str]] = None,
+                          deadline_seconds: Optional[float] = None) -> Dict[str, Any]:
+        """Main processing function that handles the entire pipeline.
+        
+        `documents` may mix paths, bytes, memoryviews and binary file-like
+        objects. `document_names` supplies the `document` field for each entry
+        and is required for any entry that is not a path.
+        
+        With `deadline_seconds`, pages are extracted in page order across
+        documents and scoring runs cheapest signals first; when the budget
+        runs out the best ranking so far is returned and `metadata.deadline`
+        records which documents, pages and stages were only partially done.
+        """
         start_time = datetime.now()
+        names = self.resolve_document_names(documents, document_names)
         
+        governor = None
+        if self.memory_limit_mb:
+            governor = MemoryGovernor(self.memory_limit_mb, batch_size=self.encode_batch_size)
+        deadline = Deadline(deadline_seconds) if deadline_seconds is not None else None
+        try:
+            return self._process_documents(documents, names, persona, job, start_time,
+                                           governor, deadline)
+        finally:
+            if governor is not None:
+                governor.close()
+    
+    def _process_documents(self, documents: Sequence[DocumentSource], names: List[str],
+                           persona: str, job: str, start_time: datetime,
+                           governor: Optional[MemoryGovernor],
+                           deadline: Optional[Deadline]) -> Dict[str, Any]:
+        """Run the pipeline, optionally under a memory governor and a deadline."""
         # Extract sections from all documents
-        all_sections = []
-        for doc_path in document_paths:
-            sections = self.extract_text_from_pdf(doc_path)
-            all_sections.extend(sections)
+        document_errors = []
+        if deadline is not None:
+            all_sections = self._extract_by_page_order(
+                documents, names, deadline, governor, document_errors
+            )
+        else:
+            all_sections = []
+            for source, name in zip(documents, names):
+                sections = self.extract_text_from_pdf(source, name, governor, document_errors)
+                all_sections.extend(sections)
+                if governor is not None and governor.spilling:
+                    self._spill_sections(all_sections, governor)
         
         # Rank sections by relevance
-        ranked_sections = self.rank_sections(all_sections, persona, job)
+        ranked_sections = self.rank_sections(all_sections, persona, job, governor, deadline)
         
         # Get top section and its best subsection
         top_section = ranked_sections[0] if ranked_sections else None
@@ -190,7 +651,7 @@ class DocumentProcessor:
                 all_subsection_analyses.append({
                     "document": section['document'],
                     "subsection_id": subsection['subsection_id'],
-                    "refined_text": subsection['refined_text'],
+                    "refined_text": self._subsection_text(subsection, governor),
                     "page_number_constraints": section['page_number'],
                     "importance_rank": subsection['importance_rank']
                 })
@@ -201,7 +662,7 @@ class DocumentProcessor:
         # Prepare output
         output = {
             "metadata": {
-                "input_documents": [os.path.basename(path) for path in document_paths],
+                "input_documents": names,
                 "persona": persona,
                 "job_to_be_done": job,
                 "processing_timestamp": start_time.isoformat()
@@ -210,4 +671,13 @@ class DocumentProcessor:
             "sub_section_analyses": all_subsection_analyses
         }
         
+        # Only present when something failed, so clean runs keep the usual format
+        if document_errors:
+            output["metadata"]["document_errors"] = document_errors
+        if governor is not None:
+            governor.check("output")
+            output["metadata"]["resource_usage"] = governor.report()
+        if deadline is not None:
+            output["metadata"]["deadline"] = deadline.report()
+        
         return output 
\ No newline at end of file
@@ -0,0 +1,337 @@
+"""
+Static-embedding fast scorer for the Persona-Driven Document Intelligence System.
+A token embedding table distilled offline from the sentence transformer, with
+mean pooling at inference time, standing in for `model.encode`.
+
+Distillation runs every vocabulary token through the full model on its own
+(as `[CLS] token [SEP]`) and keeps the pooled output as that token's static
+embedding, optionally reduced with PCA. Text is then embedded by WordPiece
+tokenization and averaging the table rows, so scoring needs only numpy.
+"""
+
+import argparse
+import functools
+import os
+import time
+import unicodedata
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+DEFAULT_MODEL_NAME = 'all-MiniLM-L6-v2'
+DEFAULT_STATIC_MODEL_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'models', 'minilm_static.npz'
+)
+
+# BERT WordPiece never splits words longer than this; they become [UNK]
+MAX_WORD_CHARS = 100
+
+# Distinct words whose WordPiece split is memoized per model
+WORD_CACHE_SIZE = 65536
+
+
+def _is_punctuation(char: str) -> bool:
+    """Match BERT's BasicTokenizer definition of punctuation."""
+    code = ord(char)
+    if 33 <= code <= 47 or 58 <= code <= 64 or 91 <= code <= 96 or 123 <= code <= 126:
+        return True
+    return unicodedata.category(char).startswith('P')
+
+
+def _is_cjk(char: str) -> bool:
+    code = ord(char)
+    return (0x4E00 <= code <= 0x9FFF or 0x3400 <= code <= 0x4DBF or 0x20000 <= code <= 0x2A6DF
+            or 0x2A700 <= code <= 0x2B73F or 0x2B740 <= code <= 0x2B81F
+            or 0x2B820 <= code <= 0x2CEAF or 0xF900 <= code <= 0xFAFF or 0x2F800 <= code <= 0x2FA1F)
+
+
+class StaticEmbeddingModel:
+    """Drop-in replacement for SentenceTransformer.encode backed by a token table."""
+
+    def __init__(self, embeddings: np.ndarray, vocab: Sequence[str], unk_token: str = '[UNK]',
+                 do_lower_case: bool = True):
+        self.embeddings = embeddings
+        self.token_to_id: Dict[str, int] = {token: i for i, token in enumerate(vocab)}
+        self.unk_id = self.token_to_id.get(unk_token)
+        self.do_lower_case = do_lower_case
+        # Words repeat heavily across sections, so WordPiece results are
+        # memoized; the bound keeps long-running workers from growing forever
+        self._wordpiece = functools.lru_cache(maxsize=WORD_CACHE_SIZE)(self._split_word)
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_STATIC_MODEL_PATH) -> 'StaticEmbeddingModel':
+        """Load a table written by distill()."""
+        if not os.path.exists(path):
+            raise FileNotFoundError(
+                f"Static model not found: {path}. Create it with: python main.py distill-scorer"
+            )
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                data['embeddings'],
+                data['vocab'].tolist(),
+                unk_token=str(data['unk_token']),
+                do_lower_case=bool(data['do_lower_case'])
+            )
+
+    def save(self, path: str):
+        """Write the table as a compressed numpy archive."""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        vocab = sorted(self.token_to_id, key=self.token_to_id.get)
+        unk_token = vocab[self.unk_id] if self.unk_id is not None else '[UNK]'
+        np.savez_compressed(
+            path,
+            embeddings=self.embeddings,
+            vocab=np.array(vocab),
+            unk_token=np.array(unk_token),
+            do_lower_case=np.array(self.do_lower_case)
+        )
+
+    def _basic_tokenize(self, text: str) -> List[str]:
+        """Split text into words the way BERT's BasicTokenizer does."""
+        if self.do_lower_case:
+            text = unicodedata.normalize('NFD', text.lower())
+            text = ''.join(c for c in text if unicodedata.category(c) != 'Mn')
+
+        words = []
+        for chunk in text.split():
+            word = []
+            for char in chunk:
+                if _is_punctuation(char) or _is_cjk(char):
+                    if word:
+                        words.append(''.join(word))
+                        word = []
+                    words.append(char)
+                elif unicodedata.category(char) not in ('Cc', 'Cf') or char in '\t\n\r':
+                    word.append(char)
+            if word:
+                words.append(''.join(word))
+        return words
+
+    def _split_word(self, word: str) -> List[int]:
+        """Greedy longest-match-first WordPiece split of one word into token ids."""
+        ids = []
+        if len(word) > MAX_WORD_CHARS:
+            ids = [self.unk_id] if self.unk_id is not None else []
+        else:
+            start = 0
+            while start < len(word):
+                end = len(word)
+                match = None
+                while start < end:
+                    piece = word[start:end] if start == 0 else '##' + word[start:end]
+                    if piece in self.token_to_id:
+                        match = self.token_to_id[piece]
+                        break
+                    end -= 1
+                if match is None:
+                    # BERT maps the whole word to [UNK] if any piece is missing
+                    ids = [self.unk_id] if self.unk_id is not None else []
+                    break
+                ids.append(match)
+                start = end
+
+        return ids
+
+    def tokenize(self, text: str) -> List[int]:
+        """Return the WordPiece token ids of a text, without special tokens."""
+        ids = []
+        for word in self._basic_tokenize(text):
+            ids.extend(self._wordpiece(word))
+        return ids
+
+    def encode(self, sentences, batch_size: Optional[int] = None, **kwargs) -> np.ndarray:
+        """Embed texts as the mean of their token embeddings.
+
+        Accepts the arguments of SentenceTransformer.encode that the processor
+        passes; batching is irrelevant for a table lookup and is ignored.
+        """
+        if isinstance(sentences, str):
+            return self.encode([sentences])[0]
+
+        output = np.zeros((len(sentences), self.embeddings.shape[1]), dtype=np.float32)
+        for i, text in enumerate(sentences):
+            ids = self.tokenize(text)
+            if ids:
+                output[i] = self.embeddings[ids].mean(axis=0, dtype=np.float32)
+        return output
+
+
+def distill(model_name: str = DEFAULT_MODEL_NAME, dims: Optional[int] = None,
+            batch_size: int = 512, verbose: bool = False) -> StaticEmbeddingModel:
+    """Build a static token table from the locally cached sentence transformer."""
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    model = SentenceTransformer(model_name, device='cpu')
+    tokenizer = model.tokenizer
+    vocab_map = tokenizer.get_vocab()
+    vocab = sorted(vocab_map, key=vocab_map.get)
+    uses_token_types = 'token_type_ids' in getattr(tokenizer, 'model_input_names', [])
+
+    rows = []
+    with torch.no_grad():
+        for start in range(0, len(vocab), batch_size):
+            token_ids = torch.arange(start, min(start + batch_size, len(vocab))).unsqueeze(1)
+            input_ids = torch.cat([
+                torch.full_like(token_ids, tokenizer.cls_token_id),
+                token_ids,
+                torch.full_like(token_ids, tokenizer.sep_token_id)
+            ], dim=1)
+            features = {'input_ids': input_ids, 'attention_mask': torch.ones_like(input_ids)}
+            if uses_token_types:
+                features['token_type_ids'] = torch.zeros_like(input_ids)
+            rows.append(model(features)['sentence_embedding'].numpy())
+            if verbose:
+                print(f"Distilled {start + len(token_ids)}/{len(vocab)} tokens", end='\r')
+    if verbose:
+        print()
+
+    embeddings = np.concatenate(rows).astype(np.float32)
+    if dims is not None and dims < embeddings.shape[1]:
+        # PCA: project onto the top principal directions of the token table
+        centered = embeddings - embeddings.mean(axis=0)
+        _, _, components = np.linalg.svd(centered, full_matrices=False)
+        embeddings = centered @ components[:dims].T
+
+    return StaticEmbeddingModel(
+        embeddings.astype(np.float16),
+        vocab,
+        unk_token=tokenizer.unk_token,
+        do_lower_case=getattr(tokenizer, 'do_lower_case', True)
+    )
+
+
+def rank_agreement(reference: np.ndarray, candidate: np.ndarray, top_k: int = 10) -> Dict[str, float]:
+    """Spearman correlation and top-K overlap between two score vectors."""
+    from scipy.stats import spearmanr
+
+    if len(reference) < 2:
+        return {"spearman": 1.0, "top_k": top_k, "top_k_overlap": 1.0}
+    spearman = spearmanr(reference, candidate)[0]
+    k = min(top_k, len(reference))
+    top_reference = set(np.argsort(-reference)[:k])
+    top_candidate = set(np.argsort(-candidate)[:k])
+    return {
+        "spearman": round(float(np.nan_to_num(spearman)), 4),
+        "top_k": k,
+        "top_k_overlap": round(len(top_reference & top_candidate) / k, 4)
+    }
+
+
+def distill_main(argv: Optional[List[str]] = None) -> int:
+    """Distill the static table from the cached model and save it."""
+    parser = argparse.ArgumentParser(
+        prog="main.py distill-scorer",
+        description="Distill a static token-embedding table for the fast scorer"
+    )
+    parser.add_argument(
+        "--model",
+        default=DEFAULT_MODEL_NAME,
+        help=f"Sentence transformer to distill (default: {DEFAULT_MODEL_NAME})"
+    )
+    parser.add_argument(
+        "--dims",
+        type=int,
+        help="Reduce embeddings to this many PCA dimensions (default: keep all)"
+    )
+    parser.add_argument(
+        "--output",
+        default=DEFAULT_STATIC_MODEL_PATH,
+        help="Output .npz path (default: models/minilm_static.npz)"
+    )
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="Enable verbose output"
+    )
+
+    args = parser.parse_args(argv)
+
+    start_time = time.time()
+    static_model = distill(args.model, dims=args.dims, verbose=args.verbose)
+    static_model.save(args.output)
+
+    size_mb = os.path.getsize(args.output) / (1024 * 1024)
+    vocab_size, dims = static_model.embeddings.shape
+    print(f"Saved {vocab_size} x {dims} table ({size_mb:.1f} MB) to {args.output} "
+          f"in {time.time() - start_time:.1f}s")
+    return 0
+
+
+def benchmark_main(argv: Optional[List[str]] = None) -> int:
+    """Compare speed and rank agreement of the fast and full scorers on real documents."""
+    parser = argparse.ArgumentParser(
+        prog="main.py benchmark-scorer",
+        description="Benchmark the fast scorer against the full sentence transformer"
+    )
+    parser.add_argument(
+        "--documents",
+        nargs="+",
+        required=True,
+        help="Paths to PDF documents whose sections are scored"
+    )
+    parser.add_argument(
+        "--persona",
+        required=True,
+        help="Persona/role description (e.g., 'Investment Analyst')"
+    )
+    parser.add_argument(
+        "--job",
+        required=True,
+        help="Job to be done (e.g., 'Analyze revenue trends')"
+    )
+    parser.add_argument(
+        "--static-model",
+        default=DEFAULT_STATIC_MODEL_PATH,
+        help="Static table created by distill-scorer (default: models/minilm_static.npz)"
+    )
+    parser.add_argument(
+        "--top-k",
+        type=int,
+        default=10,
+        help="Size of the top-K used for overlap (default: 10)"
+    )
+
+    args = parser.parse_args(argv)
+
+    from document_processor import DocumentProcessor
+    from sklearn.metrics.pairwise import cosine_similarity
+
+    timings = {}
+    start = time.perf_counter()
+    full = DocumentProcessor(scorer="full")
+    timings["full_startup_seconds"] = time.perf_counter() - start
+    start = time.perf_counter()
+    fast = DocumentProcessor(scorer="fast", static_model_path=args.static_model)
+    timings["fast_startup_seconds"] = time.perf_counter() - start
+
+    texts = []
+    for doc_path in args.documents:
+        for section in fast.extract_text_from_pdf(doc_path):
+            texts.append(section['section_title'])
+            texts.append(section['content'])
+            texts.extend(s['refined_text'] for s in fast.extract_subsections(section['content']))
+    if not texts:
+        print("Error: No text could be extracted from the documents")
+        return 1
+    context = f"{args.persona}: {args.job}"
+
+    scores = {}
+    for name, processor in (("full", full), ("fast", fast)):
+        start = time.perf_counter()
+        embeddings = processor.model.encode(texts)
+        context_embedding = processor.model.encode([context])
+        timings[f"{name}_encode_seconds"] = time.perf_counter() - start
+        scores[name] = cosine_similarity(context_embedding, embeddings)[0]
+
+    agreement = rank_agreement(scores["full"], scores["fast"], args.top_k)
+    speedup = timings["full_encode_seconds"] / max(timings["fast_encode_seconds"], 1e-9)
+
+    print(f"Texts scored:        {len(texts)}")
+    print(f"Startup (full/fast): {timings['full_startup_seconds']:.3f}s / "
+          f"{timings['fast_startup_seconds']:.3f}s")
+    print(f"Encode (full/fast):  {timings['full_encode_seconds']:.3f}s / "
+          f"{timings['fast_encode_seconds']:.3f}s ({speedup:.1f}x faster)")
+    print(f"Spearman rank corr.: {agreement['spearman']:.3f}")
+    print(f"Top-{agreement['top_k']} overlap:       {agreement['top_k_overlap']:.0%}")
+    return 0
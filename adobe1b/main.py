@@ -11,13 +11,29 @@ import sys
 import time
 from pathlib import Path
 from document_processor import DocumentProcessor
+from fast_scorer import DEFAULT_STATIC_MODEL_PATH
 
-def validate_inputs(document_paths: list, persona: str, job: str) -> bool:
+STDIN_DOCUMENT = "-"
+
+def validate_inputs(document_paths: list, persona: str, job: str,
+                    document_names: list = None) -> bool:
     """Validate input parameters."""
     if not document_paths:
         print("Error: No document paths provided")
         return False
     
+    if document_names is not None and len(document_names) != len(document_paths):
+        print("Error: --document-names must give one name per document")
+        return False
+    
+    if document_paths.count(STDIN_DOCUMENT) > 1:
+        print("Error: Standard input can only be used for one document")
+        return False
+    
+    if STDIN_DOCUMENT in document_paths and document_names is None:
+        print("Error: --document-names is required when reading a document from standard input")
+        return False
+    
     if not persona or not persona.strip():
         print("Error: Persona is required")
         return False
@@ -28,6 +44,8 @@ def validate_inputs(document_paths: list, persona: str, job: str) -> bool:
     
     # Check if all documents exist
     for doc_path in document_paths:
+        if doc_path == STDIN_DOCUMENT:
+            continue
         if not os.path.exists(doc_path):
             print(f"Error: Document not found: {doc_path}")
             return False
@@ -39,6 +57,25 @@ def validate_inputs(document_paths: list, persona: str, job: str) -> bool:
 
 def main():
     """Main function to process documents based on persona and job."""
+    # `main.py run-batch jobs/` runs a directory of job specs in one process
+    if len(sys.argv) > 1 and sys.argv[1] == "run-batch":
+        import batch_runner
+        return batch_runner.main(sys.argv[2:])
+    # `main.py worker` serves a coordinator; `main.py coordinate` shards across workers
+    if len(sys.argv) > 1 and sys.argv[1] == "worker":
+        import distributed
+        return distributed.worker_main(sys.argv[2:])
+    if len(sys.argv) > 1 and sys.argv[1] == "coordinate":
+        import distributed
+        return distributed.coordinator_main(sys.argv[2:])
+    # `main.py distill-scorer` builds the fast scorer's table; `benchmark-scorer` evaluates it
+    if len(sys.argv) > 1 and sys.argv[1] == "distill-scorer":
+        import fast_scorer
+        return fast_scorer.distill_main(sys.argv[2:])
+    if len(sys.argv) > 1 and sys.argv[1] == "benchmark-scorer":
+        import fast_scorer
+        return fast_scorer.benchmark_main(sys.argv[2:])
+    
     parser = argparse.ArgumentParser(
         description="Persona-Driven Document Intelligence System"
     )
@@ -46,7 +83,12 @@ def main():
         "--documents", 
         nargs="+", 
         required=True,
-        help="Paths to PDF documents to process"
+        help="Paths to PDF documents to process ('-' reads one PDF from standard input)"
+    )
+    parser.add_argument(
+        "--document-names",
+        nargs="+",
+        help="Names reported in the output for each document (default: file basenames)"
     )
     parser.add_argument(
         "--persona", 
@@ -63,6 +105,29 @@ def main():
         default="challenge1b_output.json",
         help="Output JSON file path (default: challenge1b_output.json)"
     )
+    parser.add_argument(
+        "--memory-limit",
+        type=float,
+        metavar="MB",
+        help="Adapt processing to stay under this resident memory limit in MB (e.g. 1024)"
+    )
+    parser.add_argument(
+        "--deadline",
+        type=float,
+        metavar="SECONDS",
+        help="Return the best ranking found within this many seconds, including model loading"
+    )
+    parser.add_argument(
+        "--scorer",
+        choices=["full", "fast"],
+        default="full",
+        help="Embed with the full transformer or the distilled static table (default: full)"
+    )
+    parser.add_argument(
+        "--static-model",
+        default=DEFAULT_STATIC_MODEL_PATH,
+        help="Static table for --scorer fast (default: models/minilm_static.npz)"
+    )
     parser.add_argument(
         "--verbose", 
         action="store_true",
@@ -72,7 +137,15 @@ def main():
     args = parser.parse_args()
     
     # Validate inputs
-    if not validate_inputs(args.documents, args.persona, args.job):
+    if not validate_inputs(args.documents, args.persona, args.job, args.document_names):
+        sys.exit(1)
+    
+    if args.memory_limit is not None and args.memory_limit <= 0:
+        print("Error: --memory-limit must be positive")
+        sys.exit(1)
+    
+    if args.deadline is not None and args.deadline <= 0:
+        print("Error: --deadline must be positive")
         sys.exit(1)
     
     if args.verbose:
@@ -86,10 +159,29 @@ def main():
     
     try:
         # Initialize processor
-        processor = DocumentProcessor()
+        processor = DocumentProcessor(
+            memory_limit_mb=args.memory_limit,
+            scorer=args.scorer,
+            static_model_path=args.static_model
+        )
+        
+        # Read a piped document into memory instead of a temp file
+        documents = [
+            sys.stdin.buffer.read() if doc == STDIN_DOCUMENT else doc
+            for doc in args.documents
+        ]
+        
+        # Model loading counts against the deadline
+        deadline_seconds = None
+        if args.deadline is not None:
+            deadline_seconds = max(0.0, args.deadline - (time.time() - start_time))
         
         # Process documents
-        result = processor.process_documents(args.documents, args.persona, args.job)
+        result = processor.process_documents(
+            documents, args.persona, args.job,
+            document_names=args.document_names,
+            deadline_seconds=deadline_seconds
+        )
         
         # Calculate processing time
         processing_time = time.time() - start_time
@@ -105,6 +197,19 @@ def main():
         
         print(f"Results saved to {args.output}")
         
+        resource_usage = result['metadata'].get('resource_usage')
+        if resource_usage and resource_usage['degradations']:
+            actions = sorted({d['action'] for d in resource_usage['degradations']})
+            print(f"Memory governor applied: {', '.join(actions)} "
+                  f"(peak RSS {resource_usage['peak_rss_mb']} MB)")
+        
+        deadline_report = result['metadata'].get('deadline')
+        if deadline_report and not deadline_report['completed']:
+            partial = [stage for stage, info in deadline_report['stages'].items()
+                       if info['status'] != 'complete']
+            print(f"Deadline reached: returned best ranking so far "
+                  f"(incomplete stages: {', '.join(partial) or 'none'})")
+        
         # Check performance constraints
         if processing_time > 60:
             print(f"Warning: Processing time ({processing_time:.2f}s) exceeds 60-second constraint")
@@ -0,0 +1,263 @@
+"""
+Runtime memory governor for the Persona-Driven Document Intelligence System.
+Tracks resident memory during extraction and encoding and tells the
+document processor how to degrade as usage approaches the configured limit.
+"""
+
+import os
+import sys
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+# Fractions of the memory limit at which each degradation kicks in
+BATCH_SHRINK_FRACTION = 0.70
+SPILL_FRACTION = 0.80
+STREAMING_FRACTION = 0.90
+
+# Batch sizes only shrink at encoding checkpoints, and after a shrink RSS
+# must grow by this fraction of the limit before the next one
+ENCODING_STAGE = "encoding"
+SHRINK_GROWTH_FRACTION = 0.05
+
+DEFAULT_BATCH_SIZE = 32
+MIN_BATCH_SIZE = 1
+
+BYTES_PER_MB = 1024 * 1024
+
+# (offset, length) of a payload inside a SpillStore
+SpillRef = Tuple[int, int]
+
+
+def current_rss_bytes() -> int:
+    """Return the resident set size of this process in bytes (0 if unknown)."""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+
+    # Not Linux: fall back to the peak RSS, which is the best we have
+    try:
+        import resource
+    except ImportError:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class SpillStore:
+    """Append-only temporary file holding spilled section text and embeddings."""
+
+    def __init__(self, spill_dir: Optional[str] = None):
+        self._file = tempfile.TemporaryFile(mode='w+b', prefix='docproc_spill_', dir=spill_dir)
+        self._lock = threading.Lock()
+        self._size = 0
+
+    def put_bytes(self, data: bytes) -> SpillRef:
+        """Append a payload and return a reference to it."""
+        with self._lock:
+            offset = self._size
+            self._file.seek(offset)
+            self._file.write(data)
+            self._size += len(data)
+        return (offset, len(data))
+
+    def get_bytes(self, ref: SpillRef) -> bytes:
+        """Read a payload back from disk."""
+        offset, length = ref
+        with self._lock:
+            self._file.seek(offset)
+            return self._file.read(length)
+
+    def put_text(self, text: str) -> SpillRef:
+        return self.put_bytes(text.encode('utf-8'))
+
+    def get_text(self, ref: SpillRef) -> str:
+        return self.get_bytes(ref).decode('utf-8')
+
+    def put_array(self, array: np.ndarray) -> SpillRef:
+        return self.put_bytes(np.ascontiguousarray(array, dtype=np.float32).tobytes())
+
+    def get_array(self, ref: SpillRef) -> np.ndarray:
+        return np.frombuffer(self.get_bytes(ref), dtype=np.float32)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._size
+
+    def close(self):
+        self._file.close()
+
+
+class LRUCache:
+    """Dict-like cache that evicts the least recently used entry when full.
+
+    Supports the subset of the dict interface the processor uses. Not
+    thread-safe; the processor guards its caches with a lock.
+    """
+
+    def __init__(self, max_entries: int):
+        if max_entries < 1:
+            raise ValueError("Cache size must be at least 1")
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def __getitem__(self, key: Hashable) -> Any:
+        self._entries.move_to_end(key)
+        return self._entries[key]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        return self[key] if key in self._entries else default
+
+    def setdefault(self, key: Hashable, value: Any) -> Any:
+        if key not in self._entries:
+            self._entries[key] = value
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return self[key]
+
+    def items(self):
+        return self._entries.items()
+
+
+class SpilledEmbeddingCache:
+    """Disk-backed stand-in for the processor's text -> embedding cache dict.
+
+    Only the keys and file offsets stay in memory, and only for the most
+    recently used `max_entries` texts. Evicted embeddings stay in the spill
+    file until the cache is dropped. Supports the subset of the dict
+    interface the processor uses.
+    """
+
+    def __init__(self, embeddings: Dict[str, np.ndarray], store: SpillStore,
+                 max_entries: int):
+        self._store = store
+        self._refs = LRUCache(max_entries)
+        for text, embedding in embeddings.items():
+            self.setdefault(text, embedding)
+
+    def __contains__(self, text: str) -> bool:
+        return text in self._refs
+
+    def __getitem__(self, text: str) -> np.ndarray:
+        return self._store.get_array(self._refs[text])
+
+    def __len__(self) -> int:
+        return len(self._refs)
+
+    def setdefault(self, text: str, embedding: np.ndarray):
+        if text not in self._refs:
+            self._refs.setdefault(text, self._store.put_array(embedding))
+        return self[text]
+
+
+class MemoryGovernor:
+    """Tracks RSS against a limit and decides which degradations to apply.
+
+    The governor only decides; the processor calls check() at safe points
+    (after each page, before each encoding batch) and reacts to the
+    batch_size, spilling and streaming properties. Degradations are one-way
+    for the lifetime of a governor, i.e. one process_documents call.
+    """
+
+    def __init__(self, memory_limit_mb: float, batch_size: int = DEFAULT_BATCH_SIZE,
+                 spill_dir: Optional[str] = None):
+        if memory_limit_mb <= 0:
+            raise ValueError("Memory limit must be positive")
+        self.memory_limit_mb = memory_limit_mb
+        self.limit_bytes = int(memory_limit_mb * BYTES_PER_MB)
+        self.spill_dir = spill_dir
+        self.peak_rss_bytes = 0
+        self.degradations: List[Dict[str, Any]] = []
+        self._batch_size = batch_size
+        self._last_shrink_rss = 0
+        self._spill_store = None
+        self._spilling = False
+        self._streaming = False
+        self._lock = threading.Lock()
+
+    @property
+    def batch_size(self) -> int:
+        return self._batch_size
+
+    @property
+    def spilling(self) -> bool:
+        return self._spilling
+
+    @property
+    def streaming(self) -> bool:
+        return self._streaming
+
+    @property
+    def spill_store(self) -> SpillStore:
+        """Temporary store for spilled data, created on first use."""
+        with self._lock:
+            if self._spill_store is None:
+                self._spill_store = SpillStore(self.spill_dir)
+            return self._spill_store
+
+    def _record(self, action: str, stage: str, rss_bytes: int, **details):
+        self.degradations.append({
+            "action": action,
+            "stage": stage,
+            "rss_mb": round(rss_bytes / BYTES_PER_MB, 1),
+            **details
+        })
+
+    def check(self, stage: str) -> int:
+        """Sample RSS, update the peak and escalate degradations. Returns RSS in bytes."""
+        rss = current_rss_bytes()
+        with self._lock:
+            self.peak_rss_bytes = max(self.peak_rss_bytes, rss)
+            usage = rss / self.limit_bytes
+
+            # Batch size only matters while encoding, and ordinary growth
+            # between checkpoints must not halve it again
+            if (stage == ENCODING_STAGE and usage >= BATCH_SHRINK_FRACTION
+                    and self._batch_size > MIN_BATCH_SIZE
+                    and (self._last_shrink_rss == 0
+                         or rss >= self._last_shrink_rss + SHRINK_GROWTH_FRACTION * self.limit_bytes)):
+                self._last_shrink_rss = rss
+                self._batch_size = max(MIN_BATCH_SIZE, self._batch_size // 2)
+                self._record("shrink_batch_size", stage, rss, batch_size=self._batch_size)
+
+            if usage >= SPILL_FRACTION and not self._spilling:
+                self._spilling = True
+                self._record("spill_to_disk", stage, rss)
+
+            if usage >= STREAMING_FRACTION and not self._streaming:
+                self._streaming = True
+                # Only PDFs opened from disk after this point can be memory-mapped
+                self._record("streaming_extraction", stage, rss, applies_to="documents read from disk")
+
+        return rss
+
+    def report(self) -> Dict[str, Any]:
+        """Summary for the output metadata."""
+        report = {
+            "memory_limit_mb": self.memory_limit_mb,
+            "peak_rss_mb": round(self.peak_rss_bytes / BYTES_PER_MB, 1),
+            "degradations": list(self.degradations)
+        }
+        if self._spill_store is not None:
+            report["spilled_mb"] = round(self._spill_store.size_bytes / BYTES_PER_MB, 1)
+        return report
+
+    def close(self):
+        """Release the spill file."""
+        with self._lock:
+            if self._spill_store is not None:
+                self._spill_store.close()
+                self._spill_store = None
@@ -3,24 +3,83 @@
 Test cases and utilities for the Persona-Driven Document Intelligence System.
 """
 
+import io
 import json
 import os
+import socket
+import subprocess
+import sys
 import tempfile
 from pathlib import Path
 from document_processor import DocumentProcessor
+from batch_runner import BatchRunner, load_job_specs
+from distributed import Coordinator, parse_address
+from fast_scorer import distill, rank_agreement
+from sklearn.metrics.pairwise import cosine_similarity
+
+LINES_PER_PAGE = 12
+
+def _pdf_string(line: str) -> str:
+    """Escape one line of text as a PDF literal string."""
+    if not line:
+        # PyPDF2 drops empty strings, so a blank line is drawn as a newline
+        # character to keep paragraph breaks in the extracted text
+        return "(\\n)"
+    return "(" + line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") + ")"
 
 def create_sample_pdf_content(content: str, filename: str) -> str:
-    """Create a temporary PDF file with sample content for testing."""
-    # This is a simplified version - in a real scenario, you'd use a PDF library
-    # For testing purposes, we'll create a text file that simulates PDF content
+    """Create a temporary PDF file with sample content for testing.
+    
+    Writes a minimal PDF by hand, one Helvetica text line per content line
+    and LINES_PER_PAGE lines per page, so no PDF writing library is needed.
+    """
     temp_dir = tempfile.mkdtemp()
     file_path = os.path.join(temp_dir, filename)
     
-    with open(file_path, 'w', encoding='utf-8') as f:
-        f.write(content)
+    lines = [line.strip() for line in content.strip().splitlines()]
+    pages = [lines[i:i + LINES_PER_PAGE] for i in range(0, len(lines), LINES_PER_PAGE)]
+    
+    # Objects 1-3 are the catalog, page tree and font; each page then adds
+    # a page object and its content stream
+    page_ids = [4 + 2 * i for i in range(len(pages))]
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{' '.join(f'{i} 0 R' for i in page_ids)}] /Count {len(pages)} >>",
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"
+    ]
+    for page_id, page_lines in zip(page_ids, pages):
+        stream = "\n".join(
+            ["BT", "/F1 10 Tf", "14 TL", "50 750 Td"]
+            + [f"{_pdf_string(line)} Tj T*" for line in page_lines]
+            + ["ET"]
+        )
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {page_id + 1} 0 R >>"
+        )
+        objects.append(f"<< /Length {len(stream.encode('latin-1'))} >>\nstream\n{stream}\nendstream")
+    
+    pdf = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(pdf))
+        pdf += f"{number} 0 obj\n{body}\nendobj\n".encode('latin-1')
+    xref_offset = len(pdf)
+    pdf += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode('latin-1')
+    for offset in offsets:
+        pdf += f"{offset:010d} 00000 n \n".encode('latin-1')
+    pdf += (f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\n"
+            f"startxref\n{xref_offset}\n%%EOF\n").encode('latin-1')
+    
+    with open(file_path, 'wb') as f:
+        f.write(pdf)
     
     return file_path
 
+def section_key(section: dict) -> tuple:
+    """Identify an extracted section independently of its score."""
+    return (section['document'], section['page_number'], section['section_title'])
+
 def create_test_case_1():
     """Create test case 1: Academic Research - Graph Neural Networks for Drug Discovery"""
     
@@ -417,6 +476,272 @@ def run_test_case(test_case: dict, test_name: str):
         print(f"Error running test case: {str(e)}")
         return False
 
+def run_in_memory_test_case(test_case: dict, test_name: str):
+    """Run a test case with documents passed as bytes, memoryviews and file objects."""
+    print(f"\n{'='*60}")
+    print(f"Running Test Case: {test_name}")
+    print(f"{'='*60}")
+    
+    try:
+        processor = DocumentProcessor()
+        
+        documents = []
+        names = []
+        for i, path in enumerate(test_case["documents"]):
+            with open(path, 'rb') as f:
+                data = f.read()
+            if i % 3 == 0:
+                documents.append(data)
+            elif i % 3 == 1:
+                documents.append(memoryview(data))
+            else:
+                documents.append(io.BytesIO(data))
+            names.append(f"in_memory_{os.path.basename(path)}")
+        
+        result = processor.process_documents(
+            documents,
+            test_case["persona"],
+            test_case["job"],
+            document_names=names
+        )
+        
+        assert result['metadata']['input_documents'] == names
+        assert result['extracted_sections'], "No sections extracted from in-memory documents"
+        for section in result['extracted_sections']:
+            assert section['document'] in names
+        
+        # In-memory sources without a name must be rejected
+        try:
+            processor.process_documents([documents[0]], test_case["persona"], test_case["job"])
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("Unnamed in-memory document was accepted")
+        
+        print(f"Processed {len(documents)} in-memory documents")
+        return True
+        
+    except Exception as e:
+        print(f"Error running test case: {str(e)}")
+        return False
+
+def run_memory_limited_test_case(test_case: dict, test_name: str):
+    """Run a test case under a memory limit low enough to force every degradation."""
+    print(f"\n{'='*60}")
+    print(f"Running Test Case: {test_name}")
+    print(f"{'='*60}")
+    
+    try:
+        baseline = DocumentProcessor().process_documents(
+            test_case["documents"], test_case["persona"], test_case["job"]
+        )
+        
+        processor = DocumentProcessor(memory_limit_mb=1)
+        result = processor.process_documents(
+            test_case["documents"], test_case["persona"], test_case["job"]
+        )
+        
+        usage = result['metadata']['resource_usage']
+        actions = {d['action'] for d in usage['degradations']}
+        print(f"Peak RSS: {usage['peak_rss_mb']} MB, degradations: {sorted(actions)}")
+        
+        assert baseline['extracted_sections'], "No sections extracted"
+        assert actions == {"shrink_batch_size", "spill_to_disk", "streaming_extraction"}, actions
+        # Degrading must not change the ranking
+        assert [section_key(s) for s in result['extracted_sections']] == \
+            [section_key(s) for s in baseline['extracted_sections']]
+        return True
+        
+    except Exception as e:
+        print(f"Error running test case: {str(e)}")
+        return False
+
+def run_deadline_test_case(test_case: dict, test_name: str):
+    """Run a test case with an already-expired deadline and with a generous one."""
+    print(f"\n{'='*60}")
+    print(f"Running Test Case: {test_name}")
+    print(f"{'='*60}")
+    
+    try:
+        processor = DocumentProcessor()
+        baseline = processor.process_documents(
+            test_case["documents"], test_case["persona"], test_case["job"]
+        )
+        assert baseline['extracted_sections'], "No sections extracted"
+        
+        # Nothing can be done in zero seconds, but the output must still be valid
+        rushed = processor.process_documents(
+            test_case["documents"], test_case["persona"], test_case["job"],
+            deadline_seconds=0
+        )
+        rushed_report = rushed['metadata']['deadline']
+        assert rushed_report['stages']['extraction']['processed'] == 0
+        # Stages that never got any work were skipped, not completed
+        assert all(stage['status'] == "skipped" for stage in rushed_report['stages'].values()), \
+            rushed_report['stages']
+        assert rushed['extracted_sections'] == []
+        print(f"Zero budget: expired during {rushed_report['expired_during']}")
+        
+        relaxed = processor.process_documents(
+            test_case["documents"], test_case["persona"], test_case["job"],
+            deadline_seconds=600
+        )
+        relaxed_report = relaxed['metadata']['deadline']
+        assert relaxed_report['completed'], relaxed_report
+        # A deadline that is never hit must not change the ranking
+        assert [s['importance_rank'] for s in relaxed['extracted_sections']] == \
+            [s['importance_rank'] for s in baseline['extracted_sections']]
+        print(f"Generous budget: completed in {relaxed_report['elapsed_seconds']:.2f}s")
+        return True
+        
+    except Exception as e:
+        print(f"Error running test case: {str(e)}")
+        return False
+
+def run_distributed_test_case(test_case: dict, test_name: str, num_workers: int = 2):
+    """Run a test case on worker processes on localhost, including one dead worker."""
+    print(f"\n{'='*60}")
+    print(f"Running Test Case: {test_name}")
+    print(f"{'='*60}")
+    
+    workers = []
+    try:
+        addresses = []
+        for _ in range(num_workers):
+            worker = subprocess.Popen(
+                [sys.executable, "main.py", "worker", "--port", "0"],
+                cwd=os.path.dirname(os.path.abspath(__file__)),
+                stdout=subprocess.PIPE,
+                text=True
+            )
+            workers.append(worker)
+            # First line is "Worker listening on host:port"
+            addresses.append(parse_address(worker.stdout.readline().split()[-1]))
+        
+        # A port nobody listens on, so its documents must be retried elsewhere
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            dead_worker = probe.getsockname()
+        
+        # A document no worker can parse must be reported, not dropped
+        corrupt_path = os.path.join(tempfile.mkdtemp(), "corrupt.pdf")
+        with open(corrupt_path, 'wb') as f:
+            f.write(b"%PDF-1.4\nnot really a pdf\n")
+        
+        top_k = 5
+        coordinator = Coordinator([dead_worker] + addresses, top_k=top_k)
+        result = coordinator.process_documents(
+            test_case["documents"] + [corrupt_path], test_case["persona"], test_case["job"]
+        )
+        baseline = DocumentProcessor().process_documents(
+            test_case["documents"], test_case["persona"], test_case["job"]
+        )
+        
+        distributed = result['metadata']['distributed']
+        failed = [failure['document'] for failure in distributed['failed_documents']]
+        assert failed == ["corrupt.pdf"], distributed['failed_documents']
+        assert "corrupt.pdf" not in distributed['assignments']
+        assert f"{dead_worker[0]}:{dead_worker[1]}" not in distributed['assignments'].values()
+        # More sections than top_k, so the merge has something to cut
+        assert len(baseline['extracted_sections']) > top_k
+        # Merging local top-Ks must give the single-process top-K; scores
+        # may differ in the last float32 bits because batches differ
+        expected = baseline['extracted_sections'][:top_k]
+        assert [section_key(s) for s in result['extracted_sections']] == \
+            [section_key(s) for s in expected]
+        assert all(abs(a['importance_rank'] - b['importance_rank']) < 1e-6
+                   for a, b in zip(result['extracted_sections'], expected))
+        
+        print(f"Assignments: {distributed['assignments']}, retries: {distributed['retries']}")
+        return True
+        
+    except Exception as e:
+        print(f"Error running test case: {str(e)}")
+        return False
+    finally:
+        for worker in workers:
+            worker.terminate()
+            worker.wait()
+
+def run_fast_scorer_test_case(test_case: dict, test_name: str):
+    """Distill the static table and compare its rankings with the full model."""
+    print(f"\n{'='*60}")
+    print(f"Running Test Case: {test_name}")
+    print(f"{'='*60}")
+    
+    try:
+        static_model_path = os.path.join(tempfile.mkdtemp(), "minilm_static.npz")
+        distill(dims=128).save(static_model_path)
+        
+        full = DocumentProcessor()
+        fast = DocumentProcessor(scorer="fast", static_model_path=static_model_path)
+        
+        # Score the subsections the pipeline would rank
+        texts = []
+        for path in test_case["documents"]:
+            for section in full.extract_text_from_pdf(path):
+                texts.extend(s['refined_text'] for s in full.extract_subsections(section['content']))
+        assert len(texts) > 5, texts
+        context = f"{test_case['persona']}: {test_case['job']}"
+        
+        scores = {}
+        for name, processor in (("full", full), ("fast", fast)):
+            embeddings = processor.model.encode(texts)
+            scores[name] = cosine_similarity(processor.model.encode([context]), embeddings)[0]
+        
+        agreement = rank_agreement(scores["full"], scores["fast"], top_k=5)
+        print(f"Spearman: {agreement['spearman']:.3f}, top-5 overlap: {agreement['top_k_overlap']:.0%}")
+        assert agreement["spearman"] > 0.3, agreement
+        return True
+        
+    except Exception as e:
+        print(f"Error running test case: {str(e)}")
+        return False
+
+def run_batch_test_case(test_cases: list, test_name: str):
+    """Run several test cases as one batch, including a deliberately broken job."""
+    print(f"\n{'='*60}")
+    print(f"Running Test Case: {test_name}")
+    print(f"{'='*60}")
+    
+    try:
+        jobs_dir = tempfile.mkdtemp()
+        output_dir = tempfile.mkdtemp()
+        for i, (name, test_case) in enumerate(test_cases, 1):
+            spec = {
+                "id": f"job_{i}",
+                "documents": test_case["documents"],
+                "persona": test_case["persona"],
+                "job": test_case["job"]
+            }
+            with open(os.path.join(jobs_dir, f"job_{i}.json"), 'w', encoding='utf-8') as f:
+                json.dump(spec, f)
+        # Same documents as job 1, so parsed sections and embeddings are shared
+        with open(os.path.join(jobs_dir, "job_repeat.json"), 'w', encoding='utf-8') as f:
+            json.dump({**test_cases[0][1], "id": "job_repeat"}, f)
+        with open(os.path.join(jobs_dir, "job_broken.json"), 'w', encoding='utf-8') as f:
+            f.write('{"persona": "Nobody"}')
+        # An id that would write its output outside output_dir
+        with open(os.path.join(jobs_dir, "job_escape.json"), 'w', encoding='utf-8') as f:
+            json.dump({**test_cases[0][1], "id": "../escape"}, f)
+        
+        runner = BatchRunner(concurrency=2)
+        summary = runner.run(load_job_specs(jobs_dir), output_dir)
+        
+        statuses = {job['id']: job['status'] for job in summary['jobs']}
+        assert statuses.pop("job_broken") == "failed"
+        assert statuses.pop("job_escape") == "failed"
+        assert not os.path.exists(os.path.join(os.path.dirname(output_dir), "escape_output.json"))
+        assert all(status == "succeeded" for status in statuses.values()), statuses
+        
+        for job in summary['jobs']:
+            print(f"  {job['id']}: {job['status']} ({job['latency_seconds']:.2f}s)")
+        return True
+        
+    except Exception as e:
+        print(f"Error running test case: {str(e)}")
+        return False
+
 def main():
     """Run all test cases."""
     print("Persona-Driven Document Intelligence System - Test Suite")
@@ -434,6 +759,31 @@ def main():
         success = run_test_case(test_case, test_name)
         results.append((test_name, success))
     
+    results.append((
+        "In-Memory Documents",
+        run_in_memory_test_case(create_test_case_1(), "In-Memory Documents")
+    ))
+    results.append((
+        "Memory Governor",
+        run_memory_limited_test_case(create_test_case_1(), "Memory Governor")
+    ))
+    results.append((
+        "Deadline",
+        run_deadline_test_case(create_test_case_2(), "Deadline")
+    ))
+    results.append((
+        "Distributed",
+        run_distributed_test_case(create_test_case_3(), "Distributed")
+    ))
+    results.append((
+        "Fast Scorer",
+        run_fast_scorer_test_case(create_test_case_1(), "Fast Scorer")
+    ))
+    results.append((
+        "Batch Runner",
+        run_batch_test_case(test_cases, "Batch Runner")
+    ))
+    
     # Summary
     print(f"\n{'='*60}")
     print("TEST SUMMARY")